@@ -8,17 +8,41 @@ admin access control, and volunteer emergency alerts.
 """
 
 import os
+import queue
 import sqlite3
+import threading
 import requests as http_requests
-from datetime import datetime
+from cachelib import FileSystemCache
+from cachetools import TTLCache
+from contextlib import closing, contextmanager
+from datetime import timedelta
 from functools import wraps
 from flask import (Flask, render_template, request, redirect,
                    url_for, flash, jsonify, session)
+from flask_session import Session
+from urgency import predict_urgency
 
 app = Flask(__name__)
 app.secret_key = "community_help_secret_key_2024"
 
+# Server-side sessions: the cookie only carries a session ID, while the
+# login details live in a file cache shared by all gunicorn workers.
+# Anonymous visitors get a session file on their first flash(), so the
+# stored lifetime is kept short for expired files to be pruned before
+# cachelib starts evicting the oldest (possibly still active) sessions.
+# Sessions are only written when modified, and the cookie still ends
+# with the browser session as before.
+app.config["SESSION_TYPE"] = "cachelib"
+app.config["SESSION_PERMANENT"] = False
+app.config["SESSION_REFRESH_EACH_REQUEST"] = False
+app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(hours=12)
+app.config["SESSION_CACHELIB"] = FileSystemCache(
+    cache_dir="flask_session", threshold=20000
+)
+Session(app)
+
 DATABASE = "community_help.db"
+DB_POOL_SIZE = 8
 
 
 # ──────────────────────────────────────────────
@@ -33,13 +57,9 @@ FAST2SMS_API_KEY = os.environ.get(
 
 
 def get_volunteer_by_email(email):
-    """Return the volunteer row for the given email, or None."""
-    conn = get_db()
-    vol = conn.execute(
-        "SELECT * FROM volunteers WHERE LOWER(email) = LOWER(?)", (email,)
-    ).fetchone()
-    conn.close()
-    return vol
+    """Return the volunteer row for the given (lowercased) email, or None."""
+    with get_db() as conn:
+        return conn.execute(SQL_SELECT_VOLUNTEER, (email,)).fetchone()
 
 
 def admin_required(f):
@@ -53,95 +73,263 @@ def admin_required(f):
     return decorated
 
 
+# ──────────────────────────────────────────────
+# SQL STATEMENTS
+# ──────────────────────────────────────────────
+# Defined once so every call passes the exact same string and hits
+# sqlite3's per-connection compiled statement cache.
+
+SQL_SELECT_REQUESTS = "SELECT * FROM help_requests ORDER BY created_at DESC"
+
+SQL_SELECT_REQUEST_CREATED_AT = "SELECT created_at FROM help_requests WHERE id = ?"
+
+SQL_SELECT_REQUEST_STATUS = "SELECT solved_status FROM help_requests WHERE id = ?"
+
+SQL_SELECT_LATEST_REQUEST_ID = (
+    "SELECT seq FROM sqlite_sequence WHERE name = 'help_requests'"
+)
+
+SQL_SELECT_NEW_ALERTS = """
+    SELECT * FROM help_requests
+    WHERE urgency = 'Emergency' AND id > (
+        SELECT last_seen_alert_id FROM volunteers WHERE email = ?
+    )
+    ORDER BY id DESC
+"""
+
+SQL_INSERT_REQUEST = """
+    INSERT INTO help_requests
+    (name, phone, address, category, description, urgency, solved_status)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_UPDATE_REQUEST_STATUS = "UPDATE help_requests SET solved_status = ? WHERE id = ?"
+
+# Admin table query for every (urgency, status) filter combination
+ADMIN_QUERIES = {
+    ("all", "all"): SQL_SELECT_REQUESTS,
+    ("all", "solved"): """
+        SELECT * FROM help_requests WHERE solved_status = 'Solved'
+        ORDER BY created_at DESC
+    """,
+    ("all", "unsolved"): """
+        SELECT * FROM help_requests WHERE solved_status = 'Unsolved'
+        ORDER BY created_at DESC
+    """,
+    ("emergency", "all"): """
+        SELECT * FROM help_requests WHERE urgency = 'Emergency'
+        ORDER BY created_at DESC
+    """,
+    ("emergency", "solved"): """
+        SELECT * FROM help_requests
+        WHERE urgency = 'Emergency' AND solved_status = 'Solved'
+        ORDER BY created_at DESC
+    """,
+    ("emergency", "unsolved"): """
+        SELECT * FROM help_requests
+        WHERE urgency = 'Emergency' AND solved_status = 'Unsolved'
+        ORDER BY created_at DESC
+    """,
+}
+
+# Summary counts for the admin stat cards, one per filter combination
+ADMIN_STATS_QUERIES = {
+    key: """
+        SELECT COUNT(*) AS total,
+               COUNT(CASE WHEN urgency = 'Emergency' THEN 1 END) AS emergency,
+               COUNT(CASE WHEN solved_status = 'Unsolved' THEN 1 END) AS unsolved,
+               COUNT(CASE WHEN solved_status = 'Solved' THEN 1 END) AS solved
+        FROM (""" + query + ")"
+    for key, query in ADMIN_QUERIES.items()
+}
+
+SQL_SELECT_VOLUNTEER = "SELECT * FROM volunteers WHERE email = ?"
+
+SQL_SELECT_VOLUNTEER_ID = "SELECT id FROM volunteers WHERE email = ?"
+
+SQL_SELECT_VOLUNTEER_PHONES = "SELECT phone FROM volunteers"
+
+SQL_COUNT_VOLUNTEERS = "SELECT COUNT(*) as c FROM volunteers"
+
+SQL_INSERT_VOLUNTEER = """
+    INSERT INTO volunteers (name, phone, email, last_seen_alert_id)
+    VALUES (?, ?, ?, ?)
+"""
+
+SQL_UPDATE_LAST_SEEN_ALERT = (
+    "UPDATE volunteers SET last_seen_alert_id = ? WHERE email = ?"
+)
+
+
 # ──────────────────────────────────────────────
 # DATABASE HELPERS
 # ──────────────────────────────────────────────
 
-def get_db():
-    """Get a database connection with row factory."""
-    conn = sqlite3.connect(DATABASE)
+# Idle connections kept open between requests
+DB_POOL = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+
+def connect_db():
+    """Open a new database connection with row factory and tuned PRAGMAs."""
+    conn = sqlite3.connect(DATABASE, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    # Fewer fsyncs (safe with WAL), in-memory temp tables, memory-mapped
+    # reads, a ~20 MB page cache and a longer wait on a locked database
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA mmap_size = 268435456")
+    conn.execute("PRAGMA cache_size = -20000")
+    conn.execute("PRAGMA busy_timeout = 10000")
     return conn
 
 
+@contextmanager
+def get_db():
+    """
+    Borrow a database connection from the pool.
+
+    A new connection is opened when the pool is empty. On exit any
+    uncommitted changes are rolled back and the connection is
+    returned to the pool (or closed if the pool is already full).
+    """
+    try:
+        conn = DB_POOL.get_nowait()
+    except queue.Empty:
+        conn = connect_db()
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        try:
+            DB_POOL.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def get_latest_request_id(conn):
+    """
+    Return the highest help request ID ever assigned (0 if none).
+
+    Reads the AUTOINCREMENT counter from sqlite_sequence, a single
+    row lookup, instead of computing MAX(id) over help_requests.
+    """
+    row = conn.execute(SQL_SELECT_LATEST_REQUEST_ID).fetchone()
+    return row["seq"] if row else 0
+
+
 def init_db():
-    """Auto-create tables if they don't exist."""
-    conn = get_db()
-    # Help requests table
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS help_requests (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            phone TEXT NOT NULL,
-            address TEXT NOT NULL,
-            category TEXT NOT NULL,
-            description TEXT NOT NULL,
-            urgency TEXT NOT NULL DEFAULT 'Low',
-            solved_status TEXT NOT NULL DEFAULT 'Unsolved',
-            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    # Volunteers table
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS volunteers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            phone TEXT NOT NULL,
-            email TEXT NOT NULL UNIQUE,
-            registered_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            last_seen_alert_id INTEGER NOT NULL DEFAULT 0
-        )
-    """)
-    conn.commit()
-    conn.close()
+    """
+    Auto-create tables if they don't exist.
+
+    Uses its own short-lived connection rather than the pool: with
+    gunicorn's preload_app this runs in the master process, and SQLite
+    connections must not be carried into forked workers.
+    """
+    with closing(connect_db()) as conn:
+        # WAL lets readers run alongside a writer; it is stored in the
+        # database file, so it only needs to be set once
+        conn.execute("PRAGMA journal_mode = WAL")
+
+        # Help requests table
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS help_requests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                phone TEXT NOT NULL,
+                address TEXT NOT NULL,
+                category TEXT NOT NULL,
+                description TEXT NOT NULL,
+                urgency TEXT NOT NULL DEFAULT 'Low',
+                solved_status TEXT NOT NULL DEFAULT 'Unsolved',
+                created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Volunteers table
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS volunteers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                phone TEXT NOT NULL,
+                email TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                registered_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                last_seen_alert_id INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # Timestamps used to be written in server-local time, while the
+        # CURRENT_TIMESTAMP defaults are UTC. Convert the old rows once
+        # (on the host that wrote them) so created_at sorts correctly;
+        # user_version records that the conversion has been done.
+        if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            conn.execute("""
+                UPDATE help_requests SET created_at = datetime(created_at, 'utc')
+                WHERE datetime(created_at, 'utc') IS NOT NULL
+            """)
+            conn.execute("""
+                UPDATE volunteers SET registered_at = datetime(registered_at, 'utc')
+                WHERE datetime(registered_at, 'utc') IS NOT NULL
+            """)
+            conn.execute("PRAGMA user_version = 1")
+        # Indexes for the request listings, filters and alert lookups
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_hr_created
+            ON help_requests(created_at DESC)
+        """)
+        # Partial index: only emergencies, for the new-alerts range lookup
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_hr_emerg_id
+            ON help_requests(id) WHERE urgency = 'Emergency'
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_hr_status
+            ON help_requests(solved_status)
+        """)
+        # Emails are stored lowercased so the UNIQUE index serves plain
+        # equality lookups; normalize rows saved before that was the case.
+        # Accounts whose emails differ only by case cannot be merged
+        # safely, so they are left as-is for manual cleanup.
+        clashes = [row[0] for row in conn.execute("""
+            SELECT lower(email) FROM volunteers
+            GROUP BY lower(email) HAVING COUNT(*) > 1
+        """)]
+        if clashes:
+            print("[DB] ⚠️ Volunteer emails differ only by case — not "
+                  f"normalized, please merge manually: {', '.join(clashes)}")
+        conn.execute("""
+            UPDATE volunteers SET email = lower(email)
+            WHERE email != lower(email) AND lower(email) NOT IN (
+                SELECT lower(email) FROM volunteers
+                GROUP BY lower(email) HAVING COUNT(*) > 1
+            )
+        """)
+        conn.commit()
 
 
 # ──────────────────────────────────────────────
-# RULE-BASED AI — Urgency Prediction
+# REQUEST LIST CACHE
 # ──────────────────────────────────────────────
 
-def predict_urgency(description: str) -> str:
-    """
-    Rule-based AI function that classifies urgency from the
-    description text using keyword matching.
+# The volunteer list is polled often; serve it from memory for a few
+# seconds instead of re-reading the whole table on every hit
+REQUESTS_CACHE = TTLCache(maxsize=1, ttl=3)
+REQUESTS_CACHE_LOCK = threading.Lock()
+
+
+def get_all_requests():
+    """Return all help requests (newest first), cached briefly."""
+    with REQUESTS_CACHE_LOCK:
+        rows = REQUESTS_CACHE.get("all")
+    if rows is None:
+        with get_db() as conn:
+            rows = conn.execute(SQL_SELECT_REQUESTS).fetchall()
+        with REQUESTS_CACHE_LOCK:
+            REQUESTS_CACHE["all"] = rows
+    return rows
 
-    Returns: 'Emergency', 'Medium', or 'Low'
-    """
-    text = description.lower()
-
-    # Emergency keywords
-    emergency_keywords = [
-        "accident", "fire", "blood", "hospital", "unconscious",
-        "emergency", "urgent", "dying", "collapse", "critical",
-        "ambulance", "heart attack", "stroke", "drowning",
-        "earthquake", "flood", "trapped", "severe", "life-threatening",
-        "choking", "bleeding", "injury", "injured", "wound",
-        "electrocution", "poison", "overdose", "suicide", "assault",
-        "violence", "gunshot", "stabbing", "burning", "explosion"
-    ]
-
-    # Medium keywords
-    medium_keywords = [
-        "food", "medicine", "support", "need help", "assistance",
-        "shelter", "clothes", "clothing", "water", "electricity",
-        "medical", "doctor", "prescription", "transport", "repair",
-        "broken", "leak", "sick", "ill", "fever", "pain",
-        "homeless", "hungry", "stranded", "lost", "disabled",
-        "elderly", "child", "baby", "pregnant", "medication"
-    ]
-
-    # Check emergency keywords first (highest priority)
-    for keyword in emergency_keywords:
-        if keyword in text:
-            return "Emergency"
-
-    # Check medium keywords
-    for keyword in medium_keywords:
-        if keyword in text:
-            return "Medium"
-
-    # Default to Low
-    return "Low"
+
+def clear_requests_cache():
+    """Drop the cached request list after a help request changes."""
+    with REQUESTS_CACHE_LOCK:
+        REQUESTS_CACHE.clear()
 
 
 # ──────────────────────────────────────────────
@@ -156,9 +344,8 @@ def send_emergency_sms(requester_name, category, description, address, phone):
     """
     try:
         # Get all volunteer phone numbers
-        conn = get_db()
-        volunteers = conn.execute("SELECT phone FROM volunteers").fetchall()
-        conn.close()
+        with get_db() as conn:
+            volunteers = conn.execute(SQL_SELECT_VOLUNTEER_PHONES).fetchall()
 
         if not volunteers:
             print("[SMS] No volunteers registered — skipping SMS.")
@@ -229,17 +416,18 @@ def submit_request():
     # Predict urgency using rule-based AI
     urgency = predict_urgency(description)
 
-    # Store in database
-    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    conn = get_db()
-    conn.execute(
-        """INSERT INTO help_requests
-           (name, phone, address, category, description, urgency, solved_status, created_at)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-        (name, phone, address, category, description, urgency, "Unsolved", created_at)
-    )
-    conn.commit()
-    conn.close()
+    # Store in database (created_at is filled in by SQLite)
+    with get_db() as conn:
+        cur = conn.execute(
+            SQL_INSERT_REQUEST,
+            (name, phone, address, category, description, urgency, "Unsolved")
+        )
+        request_id = cur.lastrowid
+        created_at = conn.execute(
+            SQL_SELECT_REQUEST_CREATED_AT, (request_id,)
+        ).fetchone()["created_at"]
+        conn.commit()
+    clear_requests_cache()
 
     # Send SMS to all volunteers if this is an Emergency
     if urgency == "Emergency":
@@ -247,6 +435,7 @@ def submit_request():
 
     # Redirect to success page with request details
     return render_template("success.html",
+                           request_id=request_id,
                            name=name,
                            phone=phone,
                            address=address,
@@ -259,29 +448,21 @@ def submit_request():
 @app.route("/requests")
 def view_requests():
     """Volunteer View — show all requests in a table."""
-    conn = get_db()
-    requests_list = conn.execute(
-        "SELECT * FROM help_requests ORDER BY created_at DESC"
-    ).fetchall()
+    requests_list = get_all_requests()
 
     # Check for emergency alerts for logged-in volunteers
     emergency_alerts = []
     volunteer = None
     vol_email = session.get("volunteer_email")
     if vol_email:
-        volunteer = conn.execute(
-            "SELECT * FROM volunteers WHERE email = ?", (vol_email,)
-        ).fetchone()
-        if volunteer:
-            last_seen = volunteer["last_seen_alert_id"]
+        # The session already holds the volunteer's details, so only
+        # the alerts newer than their last-seen ID are queried
+        volunteer = {"email": vol_email, "name": session.get("volunteer_name")}
+        with get_db() as conn:
             emergency_alerts = conn.execute(
-                """SELECT * FROM help_requests
-                   WHERE urgency = 'Emergency' AND id > ?
-                   ORDER BY created_at DESC""",
-                (last_seen,)
+                SQL_SELECT_NEW_ALERTS, (vol_email,)
             ).fetchall()
 
-    conn.close()
     return render_template("requests.html",
                            requests=requests_list,
                            emergency_alerts=emergency_alerts,
@@ -293,18 +474,12 @@ def dismiss_alerts():
     """Dismiss emergency alerts for the logged-in volunteer."""
     vol_email = session.get("volunteer_email")
     if vol_email:
-        conn = get_db()
-        # Get the latest request ID
-        latest = conn.execute(
-            "SELECT MAX(id) as max_id FROM help_requests"
-        ).fetchone()
-        if latest and latest["max_id"]:
-            conn.execute(
-                "UPDATE volunteers SET last_seen_alert_id = ? WHERE email = ?",
-                (latest["max_id"], vol_email)
-            )
-            conn.commit()
-        conn.close()
+        with get_db() as conn:
+            # Get the latest request ID
+            latest_id = get_latest_request_id(conn)
+            if latest_id:
+                conn.execute(SQL_UPDATE_LAST_SEEN_ALERT, (latest_id, vol_email))
+                conn.commit()
     return redirect(url_for("view_requests"))
 
 
@@ -318,7 +493,7 @@ def volunteer_register():
     if request.method == "POST":
         name = request.form.get("name", "").strip()
         phone = request.form.get("phone", "").strip()
-        email = request.form.get("email", "").strip()
+        email = request.form.get("email", "").strip().lower()
         access_code = request.form.get("access_code", "").strip()
 
         if not all([name, phone, email, access_code]):
@@ -330,30 +505,18 @@ def volunteer_register():
             flash("Incorrect access code. Please contact your coordinator.", "error")
             return redirect(url_for("volunteer_register"))
 
-        conn = get_db()
-        # Check if email already registered
-        existing = conn.execute(
-            "SELECT id FROM volunteers WHERE email = ?", (email,)
-        ).fetchone()
-        if existing:
-            flash("This email is already registered as a volunteer.", "error")
-            conn.close()
-            return redirect(url_for("volunteer_register"))
+        with get_db() as conn:
+            # Check if email already registered
+            existing = conn.execute(SQL_SELECT_VOLUNTEER_ID, (email,)).fetchone()
+            if existing:
+                flash("This email is already registered as a volunteer.", "error")
+                return redirect(url_for("volunteer_register"))
 
-        # Get current max request ID so they don't see old alerts
-        latest = conn.execute(
-            "SELECT MAX(id) as max_id FROM help_requests"
-        ).fetchone()
-        last_seen = latest["max_id"] if latest and latest["max_id"] else 0
-
-        conn.execute(
-            """INSERT INTO volunteers (name, phone, email, registered_at, last_seen_alert_id)
-               VALUES (?, ?, ?, ?, ?)""",
-            (name, phone, email,
-             datetime.now().strftime("%Y-%m-%d %H:%M:%S"), last_seen)
-        )
-        conn.commit()
-        conn.close()
+            # Get current max request ID so they don't see old alerts
+            last_seen = get_latest_request_id(conn)
+
+            conn.execute(SQL_INSERT_VOLUNTEER, (name, phone, email, last_seen))
+            conn.commit()
 
         # Auto-login the volunteer
         session["volunteer_email"] = email
@@ -369,7 +532,7 @@ def volunteer_register():
 def volunteer_login():
     """Login for existing volunteers."""
     if request.method == "POST":
-        email = request.form.get("email", "").strip()
+        email = request.form.get("email", "").strip().lower()
         access_code = request.form.get("access_code", "").strip()
 
         if not email or not access_code:
@@ -381,11 +544,8 @@ def volunteer_login():
             flash("Incorrect access code. Access denied.", "error")
             return redirect(url_for("volunteer_login"))
 
-        conn = get_db()
-        vol = conn.execute(
-            "SELECT * FROM volunteers WHERE email = ?", (email,)
-        ).fetchone()
-        conn.close()
+        with get_db() as conn:
+            vol = conn.execute(SQL_SELECT_VOLUNTEER, (email,)).fetchone()
 
         if not vol:
             flash("Email not found. Please register first.", "error")
@@ -475,62 +635,42 @@ def admin():
     urgency_filter = request.args.get("urgency", "all")
     status_filter = request.args.get("status", "all")
 
-    conn = get_db()
-
-    # Build query dynamically based on filters
-    query = "SELECT * FROM help_requests WHERE 1=1"
-    params = []
+    # Pick the prebuilt queries for these filters (unknown values mean "all")
+    key = (urgency_filter if urgency_filter == "emergency" else "all",
+           status_filter if status_filter in ("solved", "unsolved") else "all")
 
-    if urgency_filter == "emergency":
-        query += " AND urgency = ?"
-        params.append("Emergency")
+    with get_db() as conn:
+        stats = conn.execute(ADMIN_STATS_QUERIES[key]).fetchone()
 
-    if status_filter == "solved":
-        query += " AND solved_status = ?"
-        params.append("Solved")
-    elif status_filter == "unsolved":
-        query += " AND solved_status = ?"
-        params.append("Unsolved")
+        # Get volunteer count
+        volunteer_count = conn.execute(SQL_COUNT_VOLUNTEERS).fetchone()["c"]
 
-    # Always sort by latest first
-    query += " ORDER BY created_at DESC"
-
-    requests_list = conn.execute(query, params).fetchall()
-
-    # Get volunteer count
-    volunteer_count = conn.execute("SELECT COUNT(*) as c FROM volunteers").fetchone()["c"]
-
-    conn.close()
-
-    return render_template("admin.html",
-                           requests=requests_list,
-                           urgency_filter=urgency_filter,
-                           status_filter=status_filter,
-                           admin_name=session.get("admin_name", "Admin"),
-                           volunteer_count=volunteer_count)
+        # Rendered while the connection is held so the template can
+        # iterate the cursor directly instead of a fetched list
+        return render_template("admin.html",
+                               requests=conn.execute(ADMIN_QUERIES[key]),
+                               stats=stats,
+                               urgency_filter=urgency_filter,
+                               status_filter=status_filter,
+                               admin_name=session.get("admin_name", "Admin"),
+                               volunteer_count=volunteer_count)
 
 
 @app.route("/admin/toggle/<int:request_id>", methods=["POST"])
 @admin_required
 def toggle_status(request_id):
     """Toggle the solved/unsolved status of a request."""
-    conn = get_db()
-    row = conn.execute(
-        "SELECT solved_status FROM help_requests WHERE id = ?", (request_id,)
-    ).fetchone()
-
-    if row:
-        new_status = "Solved" if row["solved_status"] == "Unsolved" else "Unsolved"
-        conn.execute(
-            "UPDATE help_requests SET solved_status = ? WHERE id = ?",
-            (new_status, request_id)
-        )
-        conn.commit()
-        flash(f"Request #{request_id} marked as {new_status}.", "success")
-    else:
-        flash(f"Request #{request_id} not found.", "error")
+    with get_db() as conn:
+        row = conn.execute(SQL_SELECT_REQUEST_STATUS, (request_id,)).fetchone()
 
-    conn.close()
+        if row:
+            new_status = "Solved" if row["solved_status"] == "Unsolved" else "Unsolved"
+            conn.execute(SQL_UPDATE_REQUEST_STATUS, (new_status, request_id))
+            conn.commit()
+            clear_requests_cache()
+            flash(f"Request #{request_id} marked as {new_status}.", "success")
+        else:
+            flash(f"Request #{request_id} not found.", "error")
 
     # Preserve current filters when redirecting back
     urgency_filter = request.form.get("urgency_filter", "all")
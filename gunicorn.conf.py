@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for the Community Help Request Management System.
+Picked up automatically by `gunicorn app:app` (Procfile / render.yaml).
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Preforked workers, each serving requests on a small thread pool.
+# os.cpu_count() reports the host's cores, not the container's share,
+# so the default is capped to keep small instances within memory.
+workers = int(os.environ.get(
+    "WEB_CONCURRENCY", min(2 * (os.cpu_count() or 1) + 1, 4)
+))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Import the app once in the master so compiled keyword regexes and the
+# DB schema check are shared copy-on-write by every worker
+preload_app = True
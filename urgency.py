@@ -0,0 +1,110 @@
+"""
+Rule-based AI — Urgency Prediction
+==================================
+Classifies a help request description as 'Emergency', 'Medium'
+or 'Low' using keyword matching. The keyword regexes are compiled
+once at import time, so every importer (and, with gunicorn's
+preload_app, every worker) shares a single copy. The result cache
+for short descriptions starts empty and fills separately in each
+worker process.
+"""
+
+import re
+from functools import lru_cache
+
+# Emergency keywords
+EMERGENCY_KEYWORDS = [
+    "accident", "fire", "blood", "hospital", "unconscious",
+    "emergency", "urgent", "dying", "collapse", "critical",
+    "ambulance", "heart attack", "stroke", "drowning",
+    "earthquake", "flood", "trapped", "severe", "life-threatening",
+    "choking", "bleeding", "injury", "injured", "wound",
+    "electrocution", "poison", "overdose", "suicide", "assault",
+    "violence", "gunshot", "stabbing", "burning", "explosion"
+]
+
+# Medium keywords
+MEDIUM_KEYWORDS = [
+    "food", "medicine", "support", "need help", "assistance",
+    "shelter", "clothes", "clothing", "water", "electricity",
+    "medical", "doctor", "prescription", "transport", "repair",
+    "broken", "leak", "sick", "ill", "fever", "pain",
+    "homeless", "hungry", "stranded", "lost", "disabled",
+    "elderly", "child", "baby", "pregnant", "medication"
+]
+
+# Words that start with a keyword but mean something else
+# ("fired" from a job, "paint" / "illegal" are not "pain" / "ill")
+EXCLUDED_PREFIXES = [
+    "fired", "paint", "illegal", "illusion", "illustrat", "illumin"
+]
+
+
+def keyword_pattern(keyword):
+    """Regex for a keyword, also matching its y -> ies/ied forms."""
+    word = re.escape(keyword)
+    if re.search(r"[^aeiou]y$", keyword):
+        # injury -> injuries, baby -> babies
+        return word[:-1] + "(?:y|ies|ied)"
+    return word
+
+
+def compile_keywords(keywords):
+    """
+    Compile keywords into one case-insensitive regex that matches
+    them at the start of a word, so any ending is accepted
+    ("urgently", "hospitalized", "painful", "childhood") but a
+    keyword inside another word is not ("skill" is not "ill").
+    """
+    pattern = (
+        r"\b(?!" + "|".join(EXCLUDED_PREFIXES) + ")"
+        r"(?:" + "|".join(map(keyword_pattern, keywords)) + ")"
+    )
+    # Keywords are plain ASCII, so ASCII-only case folding and word
+    # boundaries keep the C matcher off its slower Unicode paths
+    return re.compile(pattern, re.IGNORECASE | re.ASCII)
+
+
+# Compiled once at import time and shared by every request
+EMERGENCY_RE = compile_keywords(EMERGENCY_KEYWORDS)
+MEDIUM_RE = compile_keywords(MEDIUM_KEYWORDS)
+
+
+# Only short descriptions (duplicate submits, copy-pasted one-liners)
+# are memoized, which keeps the cache's memory bounded
+CACHE_MAX_LENGTH = 280
+
+
+def predict_urgency(description: str) -> str:
+    """
+    Rule-based AI function that classifies urgency from the
+    description text using keyword matching.
+
+    Keywords match at the start of a word with any ending
+    ("fires", "critically", "sickness"), except for a few words
+    that only look like them ("fired" is not "fire").
+    Results for short descriptions are memoized; call
+    classify_cached.cache_clear() after changing the keyword lists.
+
+    Returns: 'Emergency', 'Medium', or 'Low'
+    """
+    if len(description) <= CACHE_MAX_LENGTH:
+        return classify_cached(description)
+    return classify(description)
+
+
+def classify(description: str) -> str:
+    """Run the keyword scan on a description (uncached)."""
+    # Check emergency keywords first (highest priority)
+    if EMERGENCY_RE.search(description):
+        return "Emergency"
+
+    # Check medium keywords
+    if MEDIUM_RE.search(description):
+        return "Medium"
+
+    # Default to Low
+    return "Low"
+
+
+classify_cached = lru_cache(maxsize=1024)(classify)